@@ -1,9 +1,154 @@
 import os
+import sys
 import json
+import hashlib
+import tempfile
+import logging
+import logging.handlers
+import multiprocessing
 import fitz
-from collections import Counter
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 import re
 
+try:
+    import orjson
+except ImportError:  # optional; the stdlib json module produces the same output
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# A text span extracted from the PDF, with the properties the heuristics use.
+# bold is the PDF bold flag, decoded once at extraction time; the raw font
+# flags are not kept.
+Span = namedtuple("Span", "text size page bbox bold")
+
+# An outline entry. Kept as a tuple while the outline is built and turned into
+# the {"level", "text", "page"} dict of the JSON output only in the result.
+Heading = namedtuple("Heading", "level text page")
+
+# Smallest page range worth handing to a separate process; below this, reopening
+# the PDF and shipping spans back costs more than the extraction saves.
+_MIN_PAGES_PER_RANGE = 8
+
+# Outline levels, largest font size first. Every outline item shares these
+# string objects instead of building its own.
+_HEADING_LEVELS = ("H1", "H2", "H3", "H4")
+
+# Entries kept by each cached text predicate. Worker processes live for the whole
+# run, so the caches are bounded rather than growing with every PDF they see.
+_TEXT_CACHE_SIZE = 4096
+
+# Regex patterns used by the heading/title heuristics, compiled once at import.
+_PAT_ENDS_SINGLE_LETTER = re.compile(r'\b[a-z]{1}\s*$')
+_PAT_STARTS_SINGLE_LETTER = re.compile(r'^\s*[a-z]{1}\b')
+_PAT_CAMEL_CASE = re.compile(r'[a-z][A-Z][a-z]')
+_PAT_WIDE_SPACING = re.compile(r'\s{3,}')
+_PAT_REPEATED_CHAR = re.compile(r'(.)\1{3,}')
+_PAT_REPEATED_WORD = re.compile(r'(\w+)\s+\1')
+_PAT_REPEATED_ABBREV = re.compile(r'([A-Z]{2,}):\s*\1')
+_PAT_ABBREV_FRAGMENT = re.compile(r'([A-Z]{2,}):\s*[A-Za-z]{1,3}')
+_PAT_URL = re.compile(r'www\.|\.com|\.org|\.net|\.edu')
+_PAT_DIGITS_ONLY = re.compile(r'^\d+$')
+# Dates: "MM/DD/YYYY", "MM-DD-YYYY", "September 30, 2003" or "April 11"
+_PAT_DATE = re.compile(r'^(?:\d+/\d+/\d+|\d+-\d+-\d+|[A-Za-z]+\s+\d+,\s+\d+|[A-Za-z]+\s+\d+)$')
+_PAT_DATE_DAY_MONTH_YEAR = re.compile(r'^\d+\s+[A-Za-z]+\s+\d+$')
+_PAT_DATE_TITLE_MONTH = re.compile(r'^[A-Z][a-z]+\s+\d+,\s+\d+$')
+_PAT_PARENTHETICAL = re.compile(r'^\([^)]*\)$')
+_PAT_PAREN_FRAGMENT = re.compile(r'^(?:\([^)]*|[^(]*\))$')
+_PAT_PUNCT_ONLY = re.compile(r'^[^\w\s]+$')
+_PAT_STARTS_LOWER_WS = re.compile(r'^\s*[a-z]')
+_PAT_ENDS_SHORT_WORD = re.compile(r'\b[a-z]{1,2}\s*$')
+_PAT_ENDS_STOPWORD = re.compile(r'\s+(to|for|in|on|at|with|by|of|the|and|or|but)\s*$')
+_PAT_STARTS_STOPWORD = re.compile(r'^\s+(to|for|in|on|at|with|by|of|the|and|or|but)\s+')
+_PAT_EMAIL_FRAGMENT = re.compile(r'@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_PAT_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PAT_PHONE = re.compile(r'^\+?\d[\d\s\-\(\)]+$')
+_PAT_ENDS_LOWER_PERIOD = re.compile(r'[a-z]\s*[.]\s*$')
+_PAT_ENDS_COLON_OR_PERIOD = re.compile(r'[:.]\s*$')
+_PAT_MATH = re.compile(r'\s*[+\-*/=]\s*')
+_PAT_TABLE_ROW = re.compile(r'^\d+\s+[A-Za-z]+\s+')
+_PAT_ABBREV_COLON = re.compile(r'^[A-Z]{2,}:$')
+_PAT_LOWER_WORD = re.compile(r'^[a-z]+$')
+_PAT_CAPS_COLON = re.compile(r'^[A-Z][A-Z\s]+:$')
+_PAT_CAPS_PHRASE = re.compile(r'^[A-Z][A-Z\s]+$')
+_PAT_TITLE_WORD = re.compile(r'^[A-Z][a-z]+')
+_PAT_CAPS_RUN = re.compile(r'[A-Z][A-Z\s]+')
+_PAT_JOB_TITLE = re.compile(r'\b(Manager|Director|Officer|President|Vice|Chief|Head|Lead|Senior|Junior|Assistant|Coordinator|Specialist|Analyst|Consultant|Advisor|Representative|Executive|Administrator|Supervisor|Technician|Engineer|Developer|Designer|Architect)\b', re.IGNORECASE)
+
+# Glyphs PDFs use as list markers; a leading '-' also marks a list item.
+_BULLET_CHARS = frozenset('•·▪▫○●◆◇■□►▶▸▹▻▽▼▾▿◁◀◂◃◄◅◦◧◨◩◪◫◬◭◮◯◰◱◲◳◴◵◶◷◸◹◺◻◼◽◾◿')
+_LEADING_BULLET_CHARS = _BULLET_CHARS | {'-'}
+
+# Deletion tables for symbol-only and bullet-only checks: text is made up of
+# these characters (and whitespace) if nothing but whitespace survives translate().
+_SYMBOL_KILL = str.maketrans('', '', '-_=+~`!@#$%^&*()[]{}|\\:;"\'<>?,./')
+_BULLET_KILL = str.maketrans('', '', ''.join(_BULLET_CHARS))
+
+# Common paragraph words; two or more in a longer phrase suggest body text.
+# Listed most frequent first, so the regex alternation usually hits early.
+_PARAGRAPH_WORDS = ['the', 'and', 'of', 'to', 'in', 'for', 'is', 'on', 'by', 'or', 'at', 'with', 'are', 'was', 'were', 'but', 'has', 'have', 'had', 'will', 'would', 'could', 'should']
+_PARAGRAPH_WORD_SET = frozenset(_PARAGRAPH_WORDS)
+
+# Words that leave a phrase dangling when they start or end it.
+_EDGE_STOPWORDS = frozenset(['to', 'for', 'in', 'on', 'at', 'with', 'by', 'of', 'the', 'and', 'or', 'but'])
+
+# Keywords that mark table rows, form fields and form instructions.
+_FORM_WORDS = ['credit', 'credits', 'GPA', 'maintain', 'overall', 'whether', 'permanent', 'temporary', 'single', 'married', 'amount', 'total', 'rs.', 'usd', 'name', 'date', 'signature', 'phone', 'email', 'address', 'relationship', 'balance', 'account', 'number', 'id', 's.no', 'serial', 'no.', 'cost', 'price', 'value', 'sum', 'paid', 'received', 'due', 'advance', 'grant', 'loan', 'payment', 'installment', 'required', 'needed', 'requested', 'applied', 'approved', 'form', 'application', 'request', 'proposal', 'document', 'ltc', 'leave', 'travel', 'concession', 'service', 'pay', 'si', 'npa', 'da', 'hra', 'ta', 'pf', 'esi', 'gst', 'tds', 'yes', 'no', 'true', 'false', 'check', 'mark', 'government', 'servant', 'employee', 'officer', 'staff', 'full-time', 'part-time', 'divorced', 'widowed']
+_INSTRUCTION_WORDS = ['must', 'should', 'need', 'require', 'maintain', 'achieve', 'complete', 'fill', 'enter', 'write', 'sign', 'date', 'initial', 'approve', 'authorize']
+
+# Maps every ASCII non-word character to a space, so that splitting ASCII text
+# yields exactly its \w+ runs.
+_ASCII_NON_WORD = str.maketrans({c: ' ' for c in map(chr, range(128)) if not (c.isalnum() or c == '_')})
+_ASCII_LOWERCASE = 'abcdefghijklmnopqrstuvwxyz'
+
+def compile_keyword_matcher(keywords):
+    """
+    Build a function that checks if text contains any of the keywords as a whole word, ignoring case.
+    ASCII text is decided by set lookups on its word runs; the regex only runs for
+    non-ASCII text and for keywords with punctuation in them (like "rs." or "full-time").
+    """
+    pattern = re.compile(r'\b(?:' + '|'.join(map(re.escape, keywords)) + r')\b', re.IGNORECASE)
+    whole_words = frozenset(keyword.lower() for keyword in keywords if keyword.isalnum())
+    leading_words = frozenset(re.match(r'\w+', keyword).group().lower() for keyword in keywords) - whole_words
+    
+    def contains_keyword(text):
+        if text.isascii():
+            words = set(text.lower().translate(_ASCII_NON_WORD).split())
+            if not words.isdisjoint(whole_words):
+                return True
+            if words.isdisjoint(leading_words):
+                return False
+        return pattern.search(text) is not None
+    
+    return contains_keyword
+
+_contains_form_word = compile_keyword_matcher(_FORM_WORDS)
+_contains_instruction_word = compile_keyword_matcher(_INSTRUCTION_WORDS)
+_contains_paragraph_word = compile_keyword_matcher(_PARAGRAPH_WORDS)
+
+def strip_section_number(text):
+    """
+    Return the text following a leading section number like "1." or "10.",
+    or None if text does not start with one. "2.1 Scope" gives "1 Scope".
+    """
+    number, dot, rest = text.partition('.')
+    if dot and number.isdecimal():
+        return rest
+    return None
+
+def is_numbered_section(text):
+    """
+    Check if text is a numbered section like "1. Introduction".
+    """
+    rest = strip_section_number(text)
+    if rest is None:
+        return False
+    title = rest.lstrip()
+    return len(title) < len(rest) and 'A' <= title[:1] <= 'Z'
+
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
 def is_meaningful_text(text):
     """
     Check if text is meaningful and not fragmented.
@@ -19,11 +164,11 @@ def is_meaningful_text(text):
         return False
     
     # Just symbols
-    if re.match(r'^[-_=+~`!@#$%^&*()\[\]{}|\\:;"\'<>?,./\s]*$', text):
+    if not text.translate(_SYMBOL_KILL).strip():
         return False
     
     # Bullet points
-    if re.match(r'^[•·▪▫○●◆◇■□►▶▸▹▻▽▼▾▿◁◀◂◃◄◅◦◧◨◩◪◫◬◭◮◯◰◱◲◳◴◵◶◷◸◹◺◻◼◽◾◿\s]*$', text):
+    if not text.translate(_BULLET_KILL).strip():
         return False
     
     # Separators
@@ -32,124 +177,126 @@ def is_meaningful_text(text):
     
     return True
 
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
 def is_fragmented_text(text):
     """
     Check if text appears to be fragmented or incomplete.
     Universal approach that works for any PDF.
     """
+    # Cheap length and word-count checks first; the regex checks below only
+    # run for text that survives them.
+    length = len(text)
+    
     # Very short text (likely fragmented)
-    if len(text) < 2:
+    if length < 2:
         return True
     
-    # Single word that's very short
-    if len(text.split()) == 1 and len(text) < 3:
+    # Text that's too long for a heading (likely body text)
+    if length > 100:
         return True
     
-    # Text that ends with incomplete words (common in PDF extraction)
-    if re.search(r'\b[a-z]{1}\s*$', text):  # Ends with 1 letter word
-        return True
+    words = text.split()
+    word_count = len(words)
     
-    # Text that starts with incomplete words
-    if re.search(r'^\s*[a-z]{1}\b', text):  # Starts with 1 letter word
+    # Single word that's very short
+    if word_count == 1 and length < 3:
         return True
     
-    # CamelCase fragments (likely broken words)
-    if re.search(r'[a-z][A-Z][a-z]', text) and len(text) < 6:
+    # Text that contains too many words (likely paragraph)
+    if word_count > 8:
         return True
     
-    # Unusual spacing patterns
-    if re.search(r'\s{3,}', text):  # Multiple spaces (3 or more)
+    # Text that looks like page numbers or references
+    if text.isdecimal():  # Just numbers
         return True
     
-    # Repeated characters (likely artifacts)
-    if re.search(r'(.)\1{3,}', text):  # Same character repeated 4+ times
-        return True
+    # Text that contains common paragraph words and is long
+    if word_count > 4:
+        paragraph_word_count = sum(word in _PARAGRAPH_WORD_SET for word in text.lower().split())
+        if paragraph_word_count >= 2:  # If 2 or more paragraph words, likely not a heading
+            return True
     
-    # Repeated words or patterns (fragmented text)
-    if re.search(r'(\w+)\s+\1', text):  # Repeated words
+    # Sentence fragments that start with lowercase
+    if word_count <= 3 and 'a' <= text[0] <= 'z':
         return True
     
-    # Universal fragmented patterns - repeated abbreviations with colons
-    if re.search(r'([A-Z]{2,}):\s*\1', text):  # Repeated abbreviations with colons
+    # Text that ends with incomplete phrases
+    if words and words[-1] in _EDGE_STOPWORDS and _PAT_ENDS_STOPWORD.search(text):
         return True
     
-    # Universal fragmented patterns - abbreviation followed by short fragment
-    if re.search(r'([A-Z]{2,}):\s*[A-Za-z]{1,3}', text):  # Abbreviation followed by short fragment
+    # Text that starts with incomplete phrases
+    if text[0].isspace() and _PAT_STARTS_STOPWORD.match(text):
         return True
     
-    # URL-like fragments
-    if re.search(r'www\.|\.com|\.org|\.net|\.edu', text):
+    # CamelCase fragments (likely broken words)
+    if length < 6 and _PAT_CAMEL_CASE.search(text):
         return True
     
-    # Text that looks like page numbers or references
-    if re.match(r'^\d+$', text):  # Just numbers
+    # Text that ends with incomplete words (common in PDF extraction)
+    if _PAT_ENDS_SINGLE_LETTER.search(text):  # Ends with 1 letter word
         return True
     
-    # Date patterns
-    if re.match(r'^\d+/\d+/\d+$', text):  # MM/DD/YYYY
-        return True
-    if re.match(r'^\d+-\d+-\d+$', text):  # MM-DD-YYYY
-        return True
-    if re.match(r'^[A-Za-z]+\s+\d+,\s+\d+$', text):  # "September 30, 2003"
-        return True
-    if re.match(r'^[A-Za-z]+\s+\d+$', text):  # "April 11"
+    # Text that starts with incomplete words
+    if _PAT_STARTS_SINGLE_LETTER.search(text):  # Starts with 1 letter word
         return True
-    if re.match(r'^\d+\s+[A-Za-z]+\s+\d+$', text):  # "30 September 2003"
+    
+    # Unusual spacing patterns
+    if _PAT_WIDE_SPACING.search(text):  # Multiple spaces (3 or more)
         return True
     
-    # Parenthetical content
-    if re.match(r'^\([^)]*\)$', text):  # "(supports Ontario's lifelong learning strategy)"
+    # Repeated characters (likely artifacts)
+    if _PAT_REPEATED_CHAR.search(text):  # Same character repeated 4+ times
         return True
     
-    # Text that's just punctuation or symbols
-    if re.match(r'^[^\w\s]+$', text):
+    # Repeated words or patterns (fragmented text)
+    if _PAT_REPEATED_WORD.search(text):  # Repeated words
         return True
     
-    # Text that's too long for a heading (likely body text)
-    if len(text) > 100:
+    # Universal fragmented patterns - repeated abbreviations with colons
+    if _PAT_REPEATED_ABBREV.search(text):  # Repeated abbreviations with colons
         return True
     
-    # Text that contains too many words (likely paragraph)
-    if len(text.split()) > 8:
+    # Universal fragmented patterns - abbreviation followed by short fragment
+    if _PAT_ABBREV_FRAGMENT.search(text):  # Abbreviation followed by short fragment
         return True
     
-    # Text that contains common paragraph words and is long
-    paragraph_words = ['the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'has', 'have', 'had', 'will', 'would', 'could', 'should']
-    if len(text.split()) > 4:
-        word_count = sum(1 for word in text.lower().split() if word in paragraph_words)
-        if word_count >= 2:  # If 2 or more paragraph words, likely not a heading
-            return True
+    # URL-like fragments
+    if _PAT_URL.search(text):
+        return True
     
-    # Sentence fragments that start with lowercase
-    if re.match(r'^[a-z]', text) and len(text.split()) <= 3:
+    # Date patterns
+    if _PAT_DATE.match(text):  # MM/DD/YYYY, MM-DD-YYYY, "September 30, 2003", "April 11"
+        return True
+    if _PAT_DATE_DAY_MONTH_YEAR.match(text):  # "30 September 2003"
         return True
     
-    # Text that ends with incomplete phrases
-    if re.search(r'\s+(to|for|in|on|at|with|by|of|the|and|or|but)\s*$', text):
+    # Parenthetical content
+    if _PAT_PARENTHETICAL.match(text):  # "(supports Ontario's lifelong learning strategy)"
         return True
     
-    # Text that starts with incomplete phrases
-    if re.search(r'^\s+(to|for|in|on|at|with|by|of|the|and|or|but)\s+', text):
+    # Text that's just punctuation or symbols
+    if _PAT_PUNCT_ONLY.match(text):
         return True
     
     # Email fragments
-    if re.search(r'@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text):
+    if _PAT_EMAIL_FRAGMENT.search(text):
         return True
     
     # Parenthetical fragments
-    if re.match(r'^\([^)]*$', text) or re.match(r'^[^(]*\)$', text):
+    if _PAT_PAREN_FRAGMENT.match(text):
         return True
     
     # Text with trailing punctuation that suggests incomplete sentences
-    if re.search(r'[a-z]\s*[.]\s*$', text):  # Ends with lowercase letter followed by period
+    if _PAT_ENDS_LOWER_PERIOD.search(text):  # Ends with lowercase letter followed by period
         return True
     
     # Text that looks like bullet points or list items
-    if re.match(r'^[-•·▪▫○●◆◇■□►▶▸▹▻▽▼▾▿◁◀◂◃◄◅◦◧◨◩◪◫◬◭◮◯◰◱◲◳◴◵◶◷◸◹◺◻◼◽◾◿]\s*', text):
+    if text[:1] in _LEADING_BULLET_CHARS:
         return True
     
     return False
 
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
 def is_table_or_form_content(text):
     """
     Check if text appears to be table content, form fields, or other non-heading content.
@@ -165,9 +312,9 @@ def is_table_or_form_content(text):
     
     # Universal form field detection - look for common patterns
     # Text that ends with colon or period (common form field pattern)
-    if re.search(r'[:.]\s*$', text):
+    if _PAT_ENDS_COLON_OR_PERIOD.search(text):
         # But allow numbered sections like "1. Introduction"
-        if not re.match(r'^\d+\.\s+[A-Z]', text):
+        if not is_numbered_section(text):
             return True
     
     # Text that's just a single word (likely form field)
@@ -175,35 +322,29 @@ def is_table_or_form_content(text):
         return True
     
     # Text that contains mathematical expressions (likely table content)
-    if re.search(r'\s*[+\-*/=]\s*', text):
+    if _PAT_MATH.search(text):
         return True
     
     # Text that contains email addresses
-    if re.search(r'@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text):
+    if _PAT_EMAIL_FRAGMENT.search(text):
         return True
     
     # Text that contains URLs
-    if re.search(r'www\.|\.com|\.org|\.net|\.edu', text):
+    if _PAT_URL.search(text):
         return True
     
     # Text that's just numbers or dates
-    if re.match(r'^\d+$', text):  # Just numbers
-        return True
-    if re.match(r'^\d+/\d+/\d+$', text):  # MM/DD/YYYY
-        return True
-    if re.match(r'^\d+-\d+-\d+$', text):  # MM-DD-YYYY
-        return True
-    if re.match(r'^[A-Za-z]+\s+\d+,\s+\d+$', text):  # "September 30, 2003"
+    if _PAT_DIGITS_ONLY.match(text):  # Just numbers
         return True
-    if re.match(r'^[A-Za-z]+\s+\d+$', text):  # "April 11"
+    if _PAT_DATE.match(text):  # MM/DD/YYYY, MM-DD-YYYY, "September 30, 2003", "April 11"
         return True
     
     # Text that's just punctuation or symbols
-    if re.match(r'^[^\w\s]+$', text):
+    if _PAT_PUNCT_ONLY.match(text):
         return True
     
     # Text that looks like bullet points or list items
-    if re.match(r'^[-•·▪▫○●◆◇■□►▶▸▹▻▽▼▾▿◁◀◂◃◄◅◦◧◨◩◪◫◬◭◮◯◰◱◲◳◴◵◶◷◸◹◺◻◼◽◾◿]\s*', text):
+    if text[:1] in _LEADING_BULLET_CHARS:
         return True
     
     # Text that's too short to be a meaningful heading
@@ -216,32 +357,33 @@ def is_table_or_form_content(text):
     
     # Universal table content detection - look for patterns that suggest table rows
     # Text that starts with numbers followed by text (like "4 credits of Math")
-    if re.match(r'^\d+\s+[A-Za-z]+\s+', text):
+    if _PAT_TABLE_ROW.match(text):
         return True
     
     # Text that contains specific table-like patterns
-    if re.search(r'\b(credits?|GPA|maintain|overall|whether|permanent|temporary|single|married|amount|total|rs\.|usd|name|date|signature|phone|email|address|relationship|balance|account|number|id|s\.no|serial|no\.|cost|price|value|sum|paid|received|due|advance|grant|loan|payment|installment|required|needed|requested|applied|approved|form|application|request|proposal|document|ltc|leave|travel|concession|service|pay|si|npa|da|hra|ta|pf|esi|gst|tds|yes|no|true|false|check|mark|government|servant|employee|officer|staff|full-time|part-time|divorced|widowed)\b', text, re.IGNORECASE):
+    if _contains_form_word(text):
         return True
     
     # Text that looks like form instructions or requirements
-    if re.search(r'\b(must|should|need|require|maintain|achieve|complete|fill|enter|write|sign|date|initial|approve|authorize)\b', text, re.IGNORECASE):
+    if _contains_instruction_word(text):
         return True
     
     return False
 
-def is_heading_candidate(text, size, body_font_size, is_bold, bbox):
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
+def is_plausible_heading_text(text):
     """
-    Determine if a text span is a good heading candidate using universal structural analysis.
-    This function identifies main section headings, not title fragments or granular subsections.
+    Apply the size-independent heading filters to text.
+    Cached per text, since running headers and footers repeat on every page.
     """
-    # Basic meaningful text check
-    if not is_meaningful_text(text):
-        return False
-    
     # Too long for a heading (headings are typically short)
     if len(text) > 80:
         return False
     
+    # Basic meaningful text check
+    if not is_meaningful_text(text):
+        return False
+    
     # Filter out fragmented text
     if is_fragmented_text(text):
         return False
@@ -251,56 +393,48 @@ def is_heading_candidate(text, size, body_font_size, is_bold, bbox):
         return False
     
     # Filter out website URLs and similar
-    if re.search(r'www\.|\.com|\.org|\.net|\.edu', text):
+    if _PAT_URL.search(text):
         return False
     
     # Filter out obvious title fragments and non-heading text
-    if re.match(r'^[A-Z]{2,}:$', text):  # Abbreviations with colon like "RFP:"
+    if _PAT_ABBREV_COLON.match(text):  # Abbreviations with colon like "RFP:"
         return False
     
-    if re.match(r'^[a-z]+$', text) and len(text) < 8:  # Short lowercase words
+    if _PAT_LOWER_WORD.match(text) and len(text) < 8:  # Short lowercase words
         return False
     
-    if re.match(r'^[A-Z][a-z]+\s+\d+,\s+\d+$', text):  # Dates like "March 21, 2003"
+    if _PAT_DATE_TITLE_MONTH.match(text):  # Dates like "March 21, 2003"
         return False
     
     # Filter out empty or meaningless numbered items
-    if re.match(r'^\d+\.\s*$', text):  # Just numbers like "10. "
+    rest = strip_section_number(text)
+    if rest is not None and not rest.strip():  # Just numbers like "10. "
         return False
     
     # Filter out obvious title fragments (like "To Present a Proposal for Developing")
-    if re.search(r'\b(to|for|the|and|or|but|in|on|at|of|with|by|is|are|was|were|has|have|had|will|would|could|should)\b', text, re.IGNORECASE):
-        if len(text.split()) > 4:  # If it's a longer phrase with these words, likely title fragment
+    if len(text.split()) > 4:  # If it's a longer phrase with these words, likely title fragment
+        if _contains_paragraph_word(text):
             return False
     
-    # Universal heading detection - based on structural properties only
-    size_ratio = size / body_font_size if body_font_size > 0 else 1
-    
-    # Universal principle: Main headings must be larger than body text
-    if size_ratio >= 1.2:
-        return True
-    
-    # Universal principle: Bold text that's at least body size
-    if is_bold and size_ratio >= 1.0:
-        return True
-    
-    # Universal principle: All caps text that's larger than body (common in titles and section headers)
-    if text.isupper() and len(text) > 2 and size_ratio >= 1.1:
-        return True
-    
-    # Universal principle: Numbered sections (like "2.1 Intended Audience", "1. Introduction")
-    if re.match(r'^\d+\.\d+\s+[A-Z]', text):  # Sub-numbered sections
-        return True
-    
-    if re.match(r'^\d+\.\s+[A-Z]', text):  # Numbered sections
+    return True
+
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
+def has_heading_shape(text):
+    """
+    Check if text is shaped like a heading (numbering, capitals, resume sections),
+    which makes it a heading candidate at any font size.
+    """
+    # Universal principle: Numbered sections (like "2.1 Intended Audience", "1. Introduction"),
+    # and any other text that starts with a number and looks like a section
+    if strip_section_number(text) is not None:
         return True
     
     # Universal principle: Section headers ending with colon
-    if re.match(r'^[A-Z][A-Z\s]+:$', text):  # All caps with colon
+    if _PAT_CAPS_COLON.match(text):  # All caps with colon
         return True
     
     # Resume-specific patterns - be more lenient for resume sections
-    if re.match(r'^[A-Z][A-Z\s]+$', text) and len(text.split()) <= 4:  # All caps short phrases like "EDUCATION", "EXPERIENCE"
+    if _PAT_CAPS_PHRASE.match(text) and len(text.split()) <= 4:  # All caps short phrases like "EDUCATION", "EXPERIENCE"
         return True
     
     # Resume section patterns - be more lenient for common resume sections
@@ -309,45 +443,113 @@ def is_heading_candidate(text, size, body_font_size, is_bold, bbox):
         return True
     
     # Email addresses in resumes (contact info)
-    if re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', text):
+    if _PAT_EMAIL.match(text):
         return True
     
     # Phone numbers in resumes
-    if re.match(r'^\+?\d[\d\s\-\(\)]+$', text):
+    if _PAT_PHONE.match(text):
         return True
     
-    # Universal principle: Short, title-case phrases that are clearly headings
-    if (re.match(r'^[A-Z][a-z]+', text) and 
-        len(text.split()) <= 4 and 
-        size_ratio >= 1.1 and
-        not re.search(r'\b(the|and|or|but|in|on|at|to|for|of|with|by|is|are|was|were|has|have|had|will|would|could|should)\b', text, re.IGNORECASE)):
+    # Additional: Capture any text that looks like a form field or section header.
+    # This also covers short title-case phrases, whatever their size.
+    if _PAT_TITLE_WORD.match(text) and len(text.split()) <= 6:  # Title case with reasonable length
         return True
     
-    # Additional: Capture more form fields and numbered sections
-    if is_bold and len(text.split()) <= 6:  # Bold text with reasonable length
+    return False
+
+def is_heading_candidate(text, size, body_font_size, is_bold, bbox):
+    """
+    Determine if a text span is a good heading candidate using universal structural analysis.
+    This function identifies main section headings, not title fragments or granular subsections.
+    """
+    # Filter out text that can never be a heading, whatever its size
+    if not is_plausible_heading_text(text):
+        return False
+    
+    # Universal heading detection - based on structural properties only
+    size_ratio = size / body_font_size if body_font_size > 0 else 1
+    
+    # Universal principle: Main headings must be larger than body text
+    if size_ratio >= 1.2:
         return True
     
-    # Additional: Capture numbered sections even if not bold
-    if re.match(r'^\d+\.\d+', text):  # Any numbered section
+    # Universal principle: Bold text that's at least body size
+    if is_bold and size_ratio >= 1.0:
         return True
     
-    # Additional: Capture any bold text that looks like a heading
-    if is_bold and len(text.split()) <= 8:  # Bold text with reasonable length
+    # Universal principle: All caps text that's larger than body (common in titles and section headers)
+    if text.isupper() and len(text) > 2 and size_ratio >= 1.1:
         return True
     
-    # Additional: Capture any text that starts with a number and looks like a section
-    if re.match(r'^\d+\.', text):  # Any numbered section
+    # Additional: Capture more form fields and numbered sections
+    if is_bold and len(text.split()) <= 6:  # Bold text with reasonable length
         return True
     
-    # Additional: Capture any text that looks like a form field or section header
-    if re.match(r'^[A-Z][a-z]+', text) and len(text.split()) <= 6:  # Title case with reasonable length
+    # Additional: Capture any bold text that looks like a heading
+    if is_bold and len(text.split()) <= 8:  # Bold text with reasonable length
         return True
     
     # Final catch-all: Any text that looks like a heading based on size and format
     if size_ratio >= 1.0 and len(text.split()) <= 8:  # Reasonable size and length
         return True
     
-    return False
+    # Smaller, non-bold text only qualifies through its shape (cached per text)
+    return has_heading_shape(text)
+
+def select_heading_candidates(spans, body_font_size):
+    """
+    Return the spans that are heading candidates, in document order.
+    Repeated spans (same text, size and weight) share one verdict.
+    """
+    candidates = []
+    verdicts = {}
+    
+    for span in spans:
+        key = (span.text, span.size, span.bold)
+        verdict = verdicts.get(key)
+        if verdict is None:
+            verdict = verdicts[key] = is_heading_candidate(span.text, span.size, body_font_size, span.bold, span.bbox)
+        if verdict:
+            candidates.append(span)
+    
+    return candidates
+
+# Capitalisation shapes the title heuristics look for in a piece of text
+TextShape = namedtuple("TextShape", "title_case_name caps_name title_case_words")
+
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
+def classify_shape(text):
+    """
+    Describe the capitalisation of stripped text in one pass over its words: whether it is
+    a two-word title-case or all-caps name ("Adithi Garipelly", "ADITHI GARIPELLY"), and the
+    longest run of whitespace-separated title-case words ("Xxx Yyy Zzz") it contains.
+    """
+    words = text.split()
+    longest = 0
+    run = 0  # Title-case words just seen that the next word can extend
+    
+    for word in words:
+        # The run can end on a word that starts "Xxx"
+        if 'A' <= word[0] <= 'Z' and 'a' <= word[1:2] <= 'z':
+            longest = max(longest, run + 1)
+        
+        # It can only continue past a word that ends "Xxx", and only through whole "Xxx" words
+        head = word.rstrip(_ASCII_LOWERCASE)
+        if len(head) == 1 and len(word) > 1 and 'A' <= head <= 'Z':
+            run += 1
+        elif head and len(head) < len(word) and 'A' <= head[-1] <= 'Z':
+            run = 1
+        else:
+            run = 0
+        longest = max(longest, run)
+    
+    title_case_name = caps_name = False
+    if len(words) == 2 and not (text[0].isspace() or text[-1].isspace()):
+        title_case_name = all(len(word) > 1 and len(word.rstrip(_ASCII_LOWERCASE)) == 1 and 'A' <= word[0] <= 'Z'
+                              for word in words)
+        caps_name = all(word.isascii() and word.isalpha() and word.isupper() for word in words)
+    
+    return TextShape(title_case_name, caps_name, longest)
 
 def is_title_candidate(text, size, body_font_size, is_bold, bbox):
     """
@@ -371,7 +573,7 @@ def is_title_candidate(text, size, body_font_size, is_bold, bbox):
         return False
     
     # Filter out website URLs and similar
-    if re.search(r'www\.|\.com|\.org|\.net|\.edu', text):
+    if _PAT_URL.search(text):
         return False
     
     # Universal principle: Title should be larger than body text
@@ -384,19 +586,27 @@ def is_title_candidate(text, size, body_font_size, is_bold, bbox):
         return False
     
     # Filter out text that looks like fragmented parts of a larger title
-    if re.search(r'^\s*[a-z]', text):  # Starts with lowercase
+    if _PAT_STARTS_LOWER_WS.search(text):  # Starts with lowercase
         return False
     
     # Filter out text that ends with incomplete words
-    if re.search(r'\b[a-z]{1,2}\s*$', text):  # Ends with 1-2 letter word
+    if _PAT_ENDS_SHORT_WORD.search(text):  # Ends with 1-2 letter word
         return False
     
     # Filter out text that contains obvious fragments
-    if re.search(r'\s{3,}', text):  # Multiple spaces
+    if _PAT_WIDE_SPACING.search(text):  # Multiple spaces
         return False
     
     return True
 
+def join_spans(group):
+    """
+    Join a run of spans into one span carrying the first span's properties.
+    """
+    if len(group) == 1:
+        return group[0]
+    return group[0]._replace(text=" ".join([span.text for span in group]))
+
 def merge_adjacent_spans(spans, max_distance=50):
     """
     Merge adjacent spans that likely form a single title or heading.
@@ -405,55 +615,29 @@ def merge_adjacent_spans(spans, max_distance=50):
         return spans
     
     merged = []
-    current_group = [spans[0]]
+    group_start = 0
     
-    for i in range(1, len(spans)):
-        current_span = spans[i]
-        last_span = current_group[-1]
-        
-        # Check if spans are close together and likely part of same title
-        distance = abs(current_span["bbox"][1] - last_span["bbox"][1])  # Vertical distance
-        horizontal_distance = abs(current_span["bbox"][0] - last_span["bbox"][0])
-        
+    # Find where runs of related spans end by comparing each span with the previous one
+    for i, (last_span, current_span) in enumerate(zip(spans, spans[1:]), 1):
         # If spans are close vertically and horizontally, they might be part of same title
-        if (distance < max_distance and horizontal_distance < 200 and 
-            current_span["size"] == last_span["size"]):
-            current_group.append(current_span)
-        else:
-            # Merge the current group
-            if len(current_group) > 1:
-                merged_text = " ".join([span["text"] for span in current_group])
-                merged_span = {
-                    "text": merged_text,
-                    "size": current_group[0]["size"],
-                    "flags": current_group[0]["flags"],
-                    "page": current_group[0]["page"],
-                    "bbox": current_group[0]["bbox"]
-                }
-                merged.append(merged_span)
-            else:
-                merged.append(current_group[0])
-            current_group = [current_span]
+        if (abs(current_span.bbox[1] - last_span.bbox[1]) < max_distance and
+            abs(current_span.bbox[0] - last_span.bbox[0]) < 200 and
+            current_span.size == last_span.size):
+            continue
+        
+        merged.append(join_spans(spans[group_start:i]))
+        group_start = i
     
     # Handle the last group
-    if len(current_group) > 1:
-        merged_text = " ".join([span["text"] for span in current_group])
-        merged_span = {
-            "text": merged_text,
-            "size": current_group[0]["size"],
-            "flags": current_group[0]["flags"],
-            "page": current_group[0]["page"],
-            "bbox": current_group[0]["bbox"]
-        }
-        merged.append(merged_span)
-    else:
-        merged.append(current_group[0])
+    merged.append(join_spans(spans[group_start:]))
     
     return merged
 
 def merge_fragmented_headings(candidates):
     """
     Merge fragmented headings that likely form a single heading.
+    Each candidate is visited once: a run of fragments is absorbed into the heading
+    that starts it, and scanning resumes after the run.
     """
     if not candidates:
         return candidates
@@ -463,8 +647,8 @@ def merge_fragmented_headings(candidates):
     
     while i < len(candidates):
         current = candidates[i]
-        merged_text = current["text"]
-        merged_candidate = current.copy()
+        page, top, size = current.page, current.bbox[1], current.size
+        merged_text = current.text
         
         # Look for adjacent candidates that might be fragments
         j = i + 1
@@ -472,309 +656,483 @@ def merge_fragmented_headings(candidates):
             next_candidate = candidates[j]
             
             # Check if they're on the same page and close together
-            if (next_candidate["page"] == current["page"] and
-                abs(next_candidate["bbox"][1] - current["bbox"][1]) < 50 and  # Increased distance
-                next_candidate["size"] == current["size"]):
-                
-                # Check if they form a logical heading when combined
-                combined_text = merged_text + " " + next_candidate["text"]
-                if len(combined_text) <= 200 and not is_fragmented_text(combined_text):
-                    merged_text = combined_text
-                    merged_candidate["text"] = merged_text
-                    j += 1
-                else:
-                    break
-            else:
+            if (next_candidate.page != page or
+                abs(next_candidate.bbox[1] - top) >= 50 or  # Increased distance
+                next_candidate.size != size):
+                break
+            
+            # Check if they form a logical heading when combined. Anything over
+            # 100 characters counts as fragmented, so skip building longer strings.
+            if len(merged_text) + 1 + len(next_candidate.text) > 100:
+                break
+            combined_text = merged_text + " " + next_candidate.text
+            if is_fragmented_text(combined_text):
                 break
+            
+            merged_text = combined_text
+            j += 1
         
-        merged.append(merged_candidate)
+        merged.append(current._replace(text=merged_text) if j > i + 1 else current)
         i = j
     
     return merged
 
-def extract_title_and_headings(pdf_path):
+def iter_page_spans(doc, start=0, end=None):
     """
-    Extract title and headings from a PDF file using universal structural analysis.
-    Returns a dictionary with 'title' and 'outline' keys.
+    Yield (page_num, spans) for each page of the document from `start` up to (but
+    not including) `end`, one page at a time. With no `end`, run to the last page.
     """
-    try:
-        doc = fitz.open(pdf_path)
-        all_spans = []
-        first_page_spans = []
+    if end is None or end > len(doc):
+        end = len(doc)
+    for page_num in range(start, end):
+        page = doc.load_page(page_num)
+        blocks = page.get_text("dict", sort=True)["blocks"]
         
-        print(f"Processing PDF with {len(doc)} pages")
+        # Walk blocks -> lines -> spans in one flat pass; image blocks have no lines.
+        # Any non-empty text is kept, including single characters.
+        yield page_num, [Span(text, span["size"], page_num, span["bbox"],
+                              bool(span["flags"] & fitz.TEXT_FONT_BOLD))
+                         for block in blocks
+                         for line in block.get("lines", ())
+                         for span in line.get("spans", ())
+                         if (text := span["text"].strip())]
+
+def extract_page_range(pdf_path, start=0, end=None):
+    """
+    Extract the spans of pages `start` to `end` (exclusive) of a PDF file.
+    Returns (size_counts, heading_spans, first_page_spans): the rounded font sizes
+    of every span, the spans whose text could be a heading, and the spans of the
+    first page if it falls in the range.
+    """
+    size_counts = Counter()
+    heading_spans = []
+    first_page_spans = []
+    
+    doc = fitz.open(pdf_path)
+    try:
+        if start == 0:
+            logger.info("Processing PDF with %d pages", len(doc))
         
-        # Extract all text spans with their properties
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            blocks = page.get_text("dict", sort=True)["blocks"]
+        # Extract text spans page by page. Every span counts towards the font size
+        # statistics, but only spans whose text could be a heading are kept.
+        for page_num, page_spans in iter_page_spans(doc, start, end):
+            if page_spans:
+                logger.info("Page %d: %d spans", page_num, len(page_spans))
             
-            page_spans = 0
-            for block in blocks:
-                if "lines" in block:  # Check if block has lines
-                    for line in block["lines"]:
-                        if "spans" in line:  # Check if line has spans
-                            for span in line["spans"]:
-                                text = span["text"].strip()
-                                if text and len(text) > 0:  # Allow single characters
-                                    span_info = {
-                                        "text": text,
-                                        "size": span["size"],
-                                        "flags": span["flags"],
-                                        "page": page_num,
-                                        "bbox": span["bbox"]
-                                    }
-                                    all_spans.append(span_info)
-                                    page_spans += 1
-                                    
-                                    # Collect first page spans for title detection
-                                    if page_num == 0:
-                                        first_page_spans.append(span_info)
+            size_counts.update(round(span.size, 1) for span in page_spans)
+            heading_spans.extend(span for span in page_spans if is_plausible_heading_text(span.text))
             
-            if page_spans > 0:
-                print(f"Page {page_num}: {page_spans} spans")
-        
+            # Collect first page spans for title detection
+            if page_num == 0:
+                first_page_spans = page_spans
+    finally:
         doc.close()
+    
+    return size_counts, heading_spans, first_page_spans
+
+def combine_page_ranges(results):
+    """
+    Combine extract_page_range() results for consecutive page ranges, given in page
+    order, into the result for the whole document.
+    """
+    size_counts = Counter()
+    heading_spans = []
+    first_page_spans = []
+    for range_counts, range_heading_spans, range_first_page_spans in results:
+        size_counts.update(range_counts)
+        heading_spans.extend(range_heading_spans)
+        first_page_spans.extend(range_first_page_spans)
+    return size_counts, heading_spans, first_page_spans
+
+def build_title_and_outline(size_counts, heading_spans, first_page_spans):
+    """
+    Work out the title and outline of a document from its extracted spans.
+    Returns a dictionary with 'title' and 'outline' keys.
+    """
+    logger.info("Total spans extracted: %d", sum(size_counts.values()))
+    
+    if not size_counts:
+        return {"title": "", "outline": []}
+    
+    # Calculate body font size (most common font size)
+    body_font_size = size_counts.most_common(1)[0][0]
+    
+    logger.info("Body font size: %s", body_font_size)
+    
+    # Merge adjacent spans that likely form single titles/headings
+    first_page_spans = merge_adjacent_spans(first_page_spans)
+    
+    # Collect heading candidates with universal criteria
+    candidates = select_heading_candidates(heading_spans, body_font_size)
+    
+    logger.info("Found %d heading candidates", len(candidates))
+    
+    # Merge fragmented headings
+    candidates = merge_fragmented_headings(candidates)
+    
+    # Remove repetitive text (likely headers that appear multiple times).
+    # Span text is already stripped; keep the first occurrence of each text, in order.
+    first_by_text = {heading.text: heading for heading in reversed(candidates)}
+    candidates = [first_by_text[text] for text in dict.fromkeys(heading.text for heading in candidates)]
+    
+    # Determine heading levels using universal principles
+    if candidates:
+        # Universal approach: Group by distinct font sizes (largest first) and assign levels
+        distinct_sizes = sorted({round(candidate.size, 1) for candidate in candidates}, reverse=True)
         
-        print(f"Total spans extracted: {len(all_spans)}")
-        
-        if not all_spans:
-            return {"title": "", "outline": []}
-        
-        # Calculate body font size (most common font size)
-        sizes = [span["size"] for span in all_spans]
-        rounded_sizes = [round(s, 1) for s in sizes]
-        size_counts = Counter(rounded_sizes)
-        body_font_size = size_counts.most_common(1)[0][0] if size_counts else 0
-        
-        print(f"Body font size: {body_font_size}")
-        
-        # Merge adjacent spans that likely form single titles/headings
-        first_page_spans = merge_adjacent_spans(first_page_spans)
-        
-        # Collect heading candidates with universal criteria
-        candidates = []
-        for span in all_spans:
-            is_bold = span["flags"] & 16  # Check bold flag
-            text = span["text"]
-            size = span["size"]
-            bbox = span["bbox"]
-            
-            if is_heading_candidate(text, size, body_font_size, is_bold, bbox):
-                candidates.append(span)
-        
-        print(f"Found {len(candidates)} heading candidates")
+        # Map sizes to heading levels (H1 for largest, H2 for second largest, etc.)
+        size_to_level = dict(zip(distinct_sizes, _HEADING_LEVELS))  # Max 4 levels (H1-H4)
         
-        # Merge fragmented headings
-        candidates = merge_fragmented_headings(candidates)
+        logger.info("Distinct heading sizes: %s", distinct_sizes[:len(_HEADING_LEVELS)])
         
-        # Remove repetitive text (likely headers that appear multiple times)
-        unique_headings = []
-        seen_texts = set()
-        for heading in candidates:
-            text = heading["text"].strip()
-            if text not in seen_texts:
-                seen_texts.add(text)
-                unique_headings.append(heading)
+        # Only candidates whose size got a level make it into the outline, so drop
+        # the rest before sorting by page and position
+        levelled = [(candidate, size_to_level[size_rounded]) for candidate in candidates
+                    if (size_rounded := round(candidate.size, 1)) in size_to_level]
+        levelled.sort(key=lambda item: (item[0].page, item[0].bbox[1], item[0].bbox[0]))
         
-        candidates = unique_headings
+        # Build outline in page and position order
+        outline = [Heading(level, candidate.text + " ", candidate.page)
+                   for candidate, level in levelled]
+    else:
+        outline = []
+    
+    logger.info("Generated %d outline items", len(outline))
+    
+    # Resume-specific title correction: if we have a person's name in the outline, use it as title
+    resume_title = ""
+    if outline and len(outline) > 0:
+        # Look for a person's name pattern in the first few outline items
+        for item in outline[:3]:  # Check first 3 items
+            text = item.text.strip()
+            # Check if it looks like a person's name (title case or all caps, two words)
+            shape = classify_shape(text)
+            if ((shape.title_case_name or  # "Adithi Garipelly"
+                 shape.caps_name) and  # "ADITHI GARIPELLY"
+                len(text.split()) == 2):
+                resume_title = text + " "
+                break
+    
+    # Extract title from the first page
+    title = ""
+    if first_page_spans:
+        # Sort by size (largest first) and position (top first)
+        first_page_spans.sort(key=lambda x: (x.size, -x.bbox[1]), reverse=True)
         
-        # Determine heading levels using universal principles
-        if candidates:
-            # Sort candidates by font size (largest first)
-            candidates_sorted_by_size = sorted(candidates, key=lambda x: x["size"], reverse=True)
-            
-            # Universal approach: Group by distinct font sizes and assign levels
-            distinct_sizes = []
-            for candidate in candidates_sorted_by_size:
-                size_rounded = round(candidate["size"], 1)
-                if size_rounded not in distinct_sizes:
-                    distinct_sizes.append(size_rounded)
+        # Look for the person's name first (common in resumes)
+        for span in first_page_spans:
+            # Only bold text larger than body text can be the name
+            if not (span.bold and span.size > body_font_size):
+                continue
             
-            # Map sizes to heading levels (H1 for largest, H2 for second largest, etc.)
-            size_to_level = {}
-            for idx, size in enumerate(distinct_sizes[:4]):  # Max 4 levels (H1-H4)
-                level = f"H{idx + 1}"
-                size_to_level[size] = level
+            text = span.text.strip()
             
-            print(f"Distinct heading sizes: {distinct_sizes[:4]}")
-            
-            # Build outline by sorting candidates by page and position
-            candidates_sorted = sorted(candidates, key=lambda x: (x["page"], x["bbox"][1], x["bbox"][0]))
-            outline = []
-            
-            for candidate in candidates_sorted:
-                size_rounded = round(candidate["size"], 1)
-                
-                if size_rounded in size_to_level:
-                    outline.append({
-                        "level": size_to_level[size_rounded],
-                        "text": candidate["text"] + " ",
-                        "page": candidate["page"]
-                    })
-        else:
-            outline = []
-        
-        print(f"Generated {len(outline)} outline items")
-        
-        # Resume-specific title correction: if we have a person's name in the outline, use it as title
-        resume_title = ""
-        if outline and len(outline) > 0:
-            # Look for a person's name pattern in the first few outline items
-            for item in outline[:3]:  # Check first 3 items
-                text = item["text"].strip()
-                # Check if it looks like a person's name (title case or all caps, two words)
-                if ((re.match(r'^[A-Z][a-z]+\s+[A-Z][a-z]+$', text) or  # "Adithi Garipelly"
-                     re.match(r'^[A-Z]+\s+[A-Z]+$', text)) and  # "ADITHI GARIPELLY"
-                    len(text.split()) == 2):
-                    resume_title = text + " "
-                    break
+            # Check if it looks like a person's name (title case, reasonable length)
+            if (classify_shape(text).title_case_name and  # "Adithi Garipelly"
+                len(text.split()) == 2):  # Two words
+                title = text + " "
+                break
         
-        # Extract title from the first page
-        title = ""
-        if first_page_spans:
-            # Sort by size (largest first) and position (top first)
-            first_page_spans.sort(key=lambda x: (x["size"], -x["bbox"][1]), reverse=True)
-            
-            # Look for the person's name first (common in resumes)
+        # If no name found, look for the largest bold text that's meaningful
+        if not title:
             for span in first_page_spans:
-                text = span["text"].strip()
-                size = span["size"]
-                is_bold = span["flags"] & 16
+                text = span.text.strip()
+                size = span.size
+                is_bold = span.bold
                 
-                # Check if it looks like a person's name (title case, reasonable length)
-                if (re.match(r'^[A-Z][a-z]+\s+[A-Z][a-z]+$', text) and  # "Adithi Garipelly"
-                    len(text.split()) == 2 and  # Two words
-                    size > body_font_size and  # Larger than body text
-                    is_bold):  # Bold
-                    title = text + " "
-                    break
-            
-            # If no name found, look for the largest bold text that's meaningful
-            if not title:
-                for span in first_page_spans:
-                    text = span["text"].strip()
-                    size = span["size"]
-                    is_bold = span["flags"] & 16
+                # Simple title detection: look for the largest bold text that's meaningful
+                if (len(text) > 5 and  # Must be substantial
+                    len(text.split()) > 1 and  # Must have multiple words
+                    is_meaningful_text(text) and  # Must be meaningful
+                    not is_fragmented_text(text) and  # Not fragmented
+                    is_bold and  # Must be bold
+                    size > body_font_size):  # Must be larger than body
                     
-                    # Simple title detection: look for the largest bold text that's meaningful
-                    if (len(text) > 5 and  # Must be substantial
-                        len(text.split()) > 1 and  # Must have multiple words
-                        is_meaningful_text(text) and  # Must be meaningful
-                        not is_fragmented_text(text) and  # Not fragmented
-                        is_bold and  # Must be bold
-                        size > body_font_size):  # Must be larger than body
-                        
-                        # Additional check: make sure it's not a form field
-                        if not is_table_or_form_content(text):
-                            title = span["text"] + " "
-                            break
-            
-            # If no meaningful text found, take the largest text
-            if not title and first_page_spans:
-                title = first_page_spans[0]["text"] + "  "
-            
-            # Universal title detection: look for longer, more descriptive titles
-            if not title or len(title.strip()) < 10:
-                # Look for spans that might contain the actual document title
-                for span in first_page_spans:
-                    text = span["text"]
-                    if (len(text) > 10 and 
-                        not is_fragmented_text(text) and 
-                        not is_table_or_form_content(text) and
-                        re.search(r'[A-Z][a-z]+\s+[A-Z][a-z]+\s+[A-Z][a-z]+', text)):  # Multiple title case words
-                        title = text + "  "
-                        break
-            
-            # More comprehensive title search: look for any text that looks like a document title
-            if not title or len(title.strip()) < 5:
-                # Check all spans on first page for title-like patterns
-                for span in first_page_spans:
-                    text = span["text"]
-                    # Look for text that looks like a document title
-                    if (len(text) > 5 and 
-                        not is_fragmented_text(text) and 
-                        not is_table_or_form_content(text) and
-                        (re.search(r'[A-Z][a-z]+\s+[A-Z][a-z]+', text) or  # Title case
-                         re.search(r'[A-Z][A-Z\s]+', text))):  # All caps
-                        title = text + "  "
-                        break
-            
-            # Final fallback: if still no title, take the largest text that's not too short
-            if not title or len(title.strip()) < 3:
-                for span in first_page_spans:
-                    text = span["text"]
-                    if len(text) > 3 and not is_fragmented_text(text):
-                        title = text + "  "
+                    # Additional check: make sure it's not a form field
+                    if not is_table_or_form_content(text):
+                        title = span.text + " "
                         break
         
-        # Universal check: if title looks like a website URL, make it empty
-        if title and re.search(r'www\.|\.com|\.org|\.net|\.edu', title):
-            title = ""
-        
-        # Use resume title if we found one and the current title contains job-related patterns
-        if resume_title and ("|" in title or re.search(r'\b(Manager|Director|Officer|President|Vice|Chief|Head|Lead|Senior|Junior|Assistant|Coordinator|Specialist|Analyst|Consultant|Advisor|Representative|Executive|Administrator|Supervisor|Technician|Engineer|Developer|Designer|Architect)\b', title, re.IGNORECASE)):
-            title = resume_title
-        
-        # Universal heading merging: if we have multiple short headings that likely form a phrase
-        if outline and len(outline) > 1:
-            # Look for patterns of short headings that might form a complete phrase
-            short_headings = [item for item in outline if len(item["text"].strip()) <= 5]
-            if len(short_headings) >= 3:
-                # Check if they're all on the same page and likely form a phrase
-                same_page = all(item["page"] == short_headings[0]["page"] for item in short_headings)
-                if same_page:
-                    # Create a merged heading from short fragments
-                    merged_text = " ".join([item["text"].strip() for item in short_headings])
-                    if len(merged_text) <= 50 and not is_fragmented_text(merged_text):
-                        # Replace short headings with merged heading
-                        other_headings = [item for item in outline if len(item["text"].strip()) > 5]
-                        outline = [{"level": "H1", "text": merged_text + " ", "page": short_headings[0]["page"]}] + other_headings
+        # If no meaningful text found, take the largest text
+        if not title and first_page_spans:
+            title = first_page_spans[0].text + "  "
         
-        print(f"Title: {title}")
+        # Universal title detection: look for longer, more descriptive titles
+        if not title or len(title.strip()) < 10:
+            # Look for spans that might contain the actual document title
+            for span in first_page_spans:
+                text = span.text
+                if (len(text) > 10 and 
+                    not is_fragmented_text(text) and 
+                    not is_table_or_form_content(text) and
+                    classify_shape(text).title_case_words >= 3):  # Multiple title case words
+                    title = text + "  "
+                    break
         
-        return {"title": title, "outline": outline}
+        # More comprehensive title search: look for any text that looks like a document title
+        if not title or len(title.strip()) < 5:
+            # Check all spans on first page for title-like patterns
+            for span in first_page_spans:
+                text = span.text
+                # Look for text that looks like a document title
+                if (len(text) > 5 and 
+                    not is_fragmented_text(text) and 
+                    not is_table_or_form_content(text) and
+                    (classify_shape(text).title_case_words >= 2 or  # Title case
+                     _PAT_CAPS_RUN.search(text))):  # All caps
+                    title = text + "  "
+                    break
         
+        # Final fallback: if still no title, take the largest text that's not too short
+        if not title or len(title.strip()) < 3:
+            for span in first_page_spans:
+                text = span.text
+                if len(text) > 3 and not is_fragmented_text(text):
+                    title = text + "  "
+                    break
+    
+    # Universal check: if title looks like a website URL, make it empty
+    if title and _PAT_URL.search(title):
+        title = ""
+    
+    # Use resume title if we found one and the current title contains job-related patterns
+    if resume_title and ("|" in title or _PAT_JOB_TITLE.search(title)):
+        title = resume_title
+    
+    # Universal heading merging: if we have multiple short headings that likely form a phrase
+    # A merge needs three or more short headings, so shorter outlines never qualify
+    if len(outline) >= 3:
+        # Look for patterns of short headings that might form a complete phrase.
+        # Split the outline into short and other headings in one pass.
+        short_headings = []
+        other_headings = []
+        for item in outline:
+            (short_headings if len(item.text.strip()) <= 5 else other_headings).append(item)
+        # Only three or more fragments, all on the same page, can form a phrase
+        if (len(short_headings) >= 3 and
+                all(item.page == short_headings[0].page for item in short_headings)):
+            # Create a merged heading from short fragments
+            merged_text = " ".join([item.text.strip() for item in short_headings])
+            if len(merged_text) <= 50 and not is_fragmented_text(merged_text):
+                # Replace short headings with merged heading
+                outline = [Heading(_HEADING_LEVELS[0], merged_text + " ", short_headings[0].page)] + other_headings
+    
+    logger.info("Title: %s", title)
+    
+    return {"title": title, "outline": [heading._asdict() for heading in outline]}
+
+def extract_title_and_headings(pdf_path):
+    """
+    Extract title and headings from a PDF file using universal structural analysis.
+    Returns a dictionary with 'title' and 'outline' keys.
+    """
+    try:
+        return build_title_and_outline(*extract_page_range(pdf_path))
     except Exception as e:
-        print(f"Error processing {pdf_path}: {str(e)}")
+        logger.error("Error processing %s: %s", pdf_path, e)
         return {"title": "", "outline": []}
 
-def process_directory(input_dir="input", output_dir="output"):
+def write_json(result, output_path):
+    """
+    Write a result to a JSON file as UTF-8, indented by two spaces.
+    The file is written under a unique temporary name and then moved into place,
+    so an interrupted or concurrent run never leaves a truncated result behind.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output_path) or '.', suffix='.tmp')
+    try:
+        # Hand the descriptor to a file object straight away so it is always closed
+        f = os.fdopen(fd, 'wb')
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    
+    try:
+        with f:
+            # mkstemp creates the file owner-only; give it the mode open() would
+            umask = os.umask(0)
+            os.umask(umask)
+            os.fchmod(f.fileno(), 0o666 & ~umask)
+            
+            if orjson is not None:
+                f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+            else:
+                f.write(json.dumps(result, indent=2, ensure_ascii=False).encode('utf-8'))
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+@lru_cache(maxsize=1)
+def extractor_digest():
+    """
+    Digest of this script's source and the PyMuPDF and MuPDF versions, mixed into
+    every PDF digest so that saved results are redone whenever the extraction
+    code or the library that parses the PDFs changes.
+    """
+    with open(__file__, 'rb') as f:
+        digest = hashlib.blake2b(f.read(), digest_size=16)
+    # fitz.version is (PyMuPDF version, MuPDF version, build date)
+    digest.update(" ".join(fitz.version[:2]).encode())
+    return digest.digest()
+
+def pdf_digest(pdf_path):
+    """
+    Return a hex BLAKE2b digest identifying a PDF's contents (and the extractor).
+    """
+    digest = hashlib.blake2b(extractor_digest(), digest_size=16)
+    with open(pdf_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def saved_digest(output_path):
+    """
+    Return the PDF digest recorded next to an existing result, or None.
+    """
+    if not os.path.exists(output_path):
+        return None
+    try:
+        with open(output_path + '.sha', 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def split_page_ranges(pdf_path, workers):
+    """
+    Split a PDF into consecutive (start, end) page ranges so a large document can be
+    spread over up to `workers` processes. Small documents stay in one range.
+    """
+    try:
+        with fitz.open(pdf_path) as doc:
+            page_count = len(doc)
+    except Exception:
+        # Let the worker hit (and report) the same error
+        return [(0, None)]
+    
+    chunk = max(_MIN_PAGES_PER_RANGE, (page_count + workers - 1) // workers)
+    return [(start, min(start + chunk, page_count)) for start in range(0, max(page_count, 1), chunk)]
+
+def init_worker_logging(queue, level):
+    """
+    Route a worker process's log records to the parent process through `queue`.
+    """
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(queue)]
+    root.setLevel(level)
+
+def process_directory(input_dir="input", output_dir="output", workers=None):
     """
     Process all PDF files in the input directory and save results to output directory.
+    PDFs, and page ranges of large PDFs, are processed in parallel by up to `workers`
+    processes (default: one per CPU available to this process).
     """
     if not os.path.exists(input_dir):
-        print(f"Input directory {input_dir} does not exist")
+        logger.error("Input directory %s does not exist", input_dir)
         return
     
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
-    pdf_files = [f for f in os.listdir(input_dir) if f.lower().endswith('.pdf')]
+    # scandir gives file types without a stat() per entry; only the suffix needs lowering
+    with os.scandir(input_dir) as entries:
+        pdf_files = [entry.name for entry in entries
+                     if entry.name[-4:].lower() == '.pdf' and entry.is_file()]
     
     if not pdf_files:
-        print(f"No PDF files found in {input_dir}")
+        logger.warning("No PDF files found in %s", input_dir)
         return
     
-    print(f"Found {len(pdf_files)} PDF files to process")
+    logger.info("Found %d PDF files to process", len(pdf_files))
     
+    if workers is None:
+        # CPUs this process may actually run on; in a container limited with
+        # --cpuset-cpus that can be far fewer than os.cpu_count() reports
+        if hasattr(os, 'sched_getaffinity'):
+            workers = len(os.sched_getaffinity(0))
+        else:
+            workers = os.cpu_count() or 1
+    workers = max(1, workers)
+    
+    # Work out each PDF's input path and output file name and path once
+    paths = {}
     for filename in pdf_files:
-        pdf_path = os.path.join(input_dir, filename)
-        print(f"\nProcessing: {filename}")
-        
-        result = extract_title_and_headings(pdf_path)
-        
-        # Save result to JSON file
         output_filename = os.path.splitext(filename)[0] + '.json'
-        output_path = os.path.join(output_dir, output_filename)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-        
-        print(f"Saved: {output_filename}")
+        paths[filename] = (os.path.join(input_dir, filename), output_filename,
+                           os.path.join(output_dir, output_filename))
+    
+    # Workers hand their log records to a listener in this process, which writes
+    # them through our own handlers one whole record at a time.
+    root = logging.getLogger()
+    log_queue = multiprocessing.Queue()
+    listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    listener.start()
+    
+    try:
+        # Every page range of every PDF is an independent job. Once all the ranges of a
+        # PDF are in, combine them in page order, build its outline and save the result.
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker_logging,
+                                 initargs=(log_queue, root.level)) as executor:
+            owners = {}
+            range_futures = {}
+            pending = {}
+            digests = {}
+            for filename, (pdf_path, _, output_path) in paths.items():
+                # A PDF whose digest matches the one saved with its result is unchanged
+                try:
+                    digests[filename] = pdf_digest(pdf_path)
+                except OSError:
+                    digests[filename] = None
+                if digests[filename] is not None and digests[filename] == saved_digest(output_path):
+                    logger.info("Unchanged, skipping: %s", filename)
+                    continue
+                
+                logger.info("Processing: %s", filename)
+                range_futures[filename] = [executor.submit(extract_page_range, pdf_path, start, end)
+                                           for start, end in split_page_ranges(pdf_path, workers)]
+                pending[filename] = len(range_futures[filename])
+                owners.update(dict.fromkeys(range_futures[filename], filename))
+            
+            for future in as_completed(owners):
+                filename = owners.pop(future)
+                pending[filename] -= 1
+                if pending[filename]:
+                    continue
+                
+                pdf_path, output_filename, output_path = paths[filename]
+                digest = digests[filename]
+                try:
+                    ranges = (range_future.result() for range_future in range_futures.pop(filename))
+                    result = build_title_and_outline(*combine_page_ranges(ranges))
+                except Exception as e:
+                    logger.error("Error processing %s: %s", pdf_path, e)
+                    result = {"title": "", "outline": []}
+                    digest = None  # try again next run
+                
+                # Drop any digest from an earlier run before saving, so that a failed
+                # PDF, or a save that gets interrupted, is redone on the next run
+                sha_path = output_path + '.sha'
+                try:
+                    os.remove(sha_path)
+                except FileNotFoundError:
+                    pass
+                
+                # Save result to JSON file, then record which PDF contents it is for
+                write_json(result, output_path)
+                if digest is not None:
+                    with open(sha_path, 'w') as f:
+                        f.write(digest)
+                
+                logger.info("Saved: %s", output_filename)
+    finally:
+        listener.stop()
 
 if __name__ == "__main__":
-    import sys
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
     if len(sys.argv) > 1:
         input_dir = sys.argv[1]
     else:
@@ -785,4 +1143,9 @@ if __name__ == "__main__":
     else:
         output_dir = "output"
     
-    process_directory(input_dir, output_dir) 
\ No newline at end of file
+    if len(sys.argv) > 3:
+        workers = int(sys.argv[3])
+    else:
+        workers = None
+    
+    process_directory(input_dir, output_dir, workers) 
\ No newline at end of file
@@ -8,6 +8,143 @@ import json
 import subprocess
 import sys
 
+try:
+    import orjson
+except ImportError:  # optional; the stdlib json module parses the same files
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # optional; without it outputs are loaded whole
+    ijson = None
+
+try:
+    import fastjsonschema
+except ImportError:  # optional; without it every file goes through the checks below
+    fastjsonschema = None
+
+# Errors raised for malformed JSON by whichever parser is in use
+JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson is not None else (json.JSONDecodeError,)
+
+VALID_LEVELS = frozenset({"H1", "H2", "H3"})
+REQUIRED_ITEM_FIELDS = ("level", "text", "page")
+
+# The same rules as outline_item_error() and output_error(), as JSON Schema.
+# Draft 4, where 1.0 is not an integer, matches the isinstance(page, int) check.
+SCHEMA_DRAFT = "http://json-schema.org/draft-04/schema#"
+OUTLINE_ITEM_SCHEMA = {
+    "$schema": SCHEMA_DRAFT,
+    "type": "object",
+    "required": list(REQUIRED_ITEM_FIELDS),
+    "properties": {
+        "level": {"enum": sorted(VALID_LEVELS)},
+        "page": {"type": "integer", "minimum": 1},
+    },
+}
+OUTPUT_SCHEMA = {
+    "$schema": SCHEMA_DRAFT,
+    "type": "object",
+    "required": ["title", "outline"],
+    "properties": {"outline": {"type": "array", "items": OUTLINE_ITEM_SCHEMA}},
+}
+
+if fastjsonschema is not None:
+    validate_outline_item = fastjsonschema.compile(OUTLINE_ITEM_SCHEMA)
+    validate_output = fastjsonschema.compile(OUTPUT_SCHEMA)
+
+def matches_schema(validate, data):
+    """Return whether data passes a compiled fastjsonschema validator."""
+    try:
+        validate(data)
+    except fastjsonschema.JsonSchemaValueException:
+        return False
+    return True
+
+def load_json(path):
+    """Load a JSON file, using orjson when it is installed."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def outline_item_error(i, item):
+    """Return why outline item i is invalid, or None if it is valid."""
+    # Valid items pass the generated validator; only failures need the checks below
+    if fastjsonschema is not None and matches_schema(validate_outline_item, item):
+        return None
+    
+    if not isinstance(item, dict):
+        return f"Outline item {i} is not a dictionary"
+    
+    for field in REQUIRED_ITEM_FIELDS:
+        if field not in item:
+            return f"Outline item {i} missing '{field}' field"
+    
+    # Check level format
+    if not isinstance(item["level"], str) or item["level"] not in VALID_LEVELS:
+        return f"Invalid level '{item['level']}' in item {i}"
+    
+    # Check page number
+    if not isinstance(item["page"], int) or item["page"] < 1:
+        return f"Invalid page number {item['page']} in item {i}"
+    
+    return None
+
+def output_error(data):
+    """Return why an output document is invalid, or None if it is valid."""
+    # Valid documents pass the generated validator in one call; only failures
+    # need the checks below to say what is wrong
+    if fastjsonschema is not None and matches_schema(validate_output, data):
+        return None
+    
+    # Check required fields
+    if "title" not in data:
+        return "Missing 'title' field"
+    if "outline" not in data:
+        return "Missing 'outline' field"
+    
+    # Check outline structure
+    outline = data["outline"]
+    if not isinstance(outline, list):
+        return "'outline' is not a list"
+    
+    # Check each outline item, stopping at the first invalid one
+    return next(filter(None, (outline_item_error(i, item) for i, item in enumerate(outline))), None)
+
+def stream_output_error(path):
+    """
+    Like output_error(), but for a file parsed with ijson: the outline is checked
+    one item at a time, so only a single item is ever held in memory.
+    """
+    with open(path, 'rb') as f:
+        # First pass: top-level keys and the type of the outline value
+        keys = set()
+        outline_event = None
+        for prefix, event, value in ijson.parse(f):
+            if prefix == '' and event == 'map_key':
+                keys.add(value)
+            elif prefix == 'outline' and outline_event is None:
+                outline_event = event
+        
+        if "title" not in keys:
+            return "Missing 'title' field"
+        if "outline" not in keys:
+            return "Missing 'outline' field"
+        if outline_event != 'start_array':
+            return "'outline' is not a list"
+        
+        # Second pass: each outline item, stopping at the first invalid one
+        f.seek(0)
+        items = ijson.items(f, 'outline.item')
+        return next(filter(None, (outline_item_error(i, item) for i, item in enumerate(items))), None)
+
+def file_error(path):
+    """Return why an output file is invalid, or None if it is valid."""
+    if ijson is not None:
+        return stream_output_error(path)
+    return output_error(load_json(path))
+
 def test_solution():
     """Test the solution with sample PDFs."""
     
@@ -62,48 +199,13 @@ def test_solution():
     for json_file in json_files:
         json_path = os.path.join(output_dir, json_file)
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Check required fields
-            if "title" not in data:
-                print(f"❌ {json_file}: Missing 'title' field")
-                continue
-            if "outline" not in data:
-                print(f"❌ {json_file}: Missing 'outline' field")
-                continue
-            
-            # Check outline structure
-            outline = data["outline"]
-            if not isinstance(outline, list):
-                print(f"❌ {json_file}: 'outline' is not a list")
-                continue
-            
-            # Check each outline item
-            for i, item in enumerate(outline):
-                if not isinstance(item, dict):
-                    print(f"❌ {json_file}: Outline item {i} is not a dictionary")
-                    continue
-                
-                required_fields = ["level", "text", "page"]
-                for field in required_fields:
-                    if field not in item:
-                        print(f"❌ {json_file}: Outline item {i} missing '{field}' field")
-                        break
-                else:
-                    # Check level format
-                    if not item["level"].startswith("H") or item["level"][1:] not in ["1", "2", "3"]:
-                        print(f"❌ {json_file}: Invalid level '{item['level']}' in item {i}")
-                        continue
-                    
-                    # Check page number
-                    if not isinstance(item["page"], int) or item["page"] < 1:
-                        print(f"❌ {json_file}: Invalid page number {item['page']} in item {i}")
-                        continue
-            
-            print(f"✅ {json_file}: Valid format")
+            error = file_error(json_path)
+            if error:
+                print(f"❌ {json_file}: {error}")
+            else:
+                print(f"✅ {json_file}: Valid format")
             
-        except json.JSONDecodeError as e:
+        except JSON_ERRORS as e:
             print(f"❌ {json_file}: Invalid JSON format - {e}")
         except Exception as e:
             print(f"❌ {json_file}: Error reading file - {e}")
@@ -131,8 +233,7 @@ def show_sample_output():
     print("-" * 40)
     
     try:
-        with open(sample_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_json(sample_path)
         
         print(f"Title: {data.get('title', 'N/A')}")
         print(f"Number of headings: {len(data.get('outline', []))}")